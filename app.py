@@ -9,11 +9,24 @@ matplotlib.use('Agg')  # Utiliser le backend Agg qui ne nécessite pas Tkinter
 import matplotlib.pyplot as plt
 import io
 import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
 from scipy import signal
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Downsampling settings for the plot series returned to the frontend
+DOWNSAMPLING_METHODS = ('lttb', 'minmax', 'none')
+DEFAULT_DOWNSAMPLING_METHOD = 'lttb'
+DEFAULT_TARGET_POINTS = 1000
+MIN_TARGET_POINTS = 3
+MAX_TARGET_POINTS = 100000
+MIN_PYRAMID_POINTS = 256  # Stop building coarser levels below this size
+SERIES_CACHE_SIZE = 64  # Number of series whose pyramids are kept in memory
+
 # Helper functions for calculations
 def q_function(x):
     return 0.5 * special.erfc(x / np.sqrt(2))
@@ -111,6 +124,221 @@ def generate_gain_spectrum(wavelengths, gains, noise_figures):
     
     return img_str
 
+# Downsampling helpers
+# Browsers only draw about a thousand pixels per plot, so every series is
+# decimated server-side before being serialized into the JSON response.
+def bucket_extreme_indices(y, starts, reduce):
+    """Return the index of the first extreme sample of every bucket of y"""
+    n = len(y)
+    extremes = reduce.reduceat(y, starts)
+    bucket_ids = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+    hits = np.flatnonzero(y == extremes[bucket_ids])
+
+    # Buckets made only of NaN have no hit and fall back to their first sample
+    indices = starts.copy()
+    hit_buckets, first_hits = np.unique(bucket_ids[hits], return_index=True)
+    indices[hit_buckets] = hits[first_hits]
+    return indices
+
+def minmax_indices(y, num_buckets):
+    """Return the sorted indices of the min and max of each bucket of y"""
+    n = len(y)
+    if num_buckets <= 0 or n <= 2 * num_buckets:
+        return np.arange(n)
+
+    # Same integer edges as LTTB so every bucket holds real samples
+    starts = np.linspace(0, n, num_buckets + 1).astype(int)[:-1]
+    mins = bucket_extreme_indices(y, starts, np.fmin)
+    maxs = bucket_extreme_indices(y, starts, np.fmax)
+    return np.unique(np.concatenate((mins, maxs)))
+
+def lttb_indices(x, y, num_points):
+    """Return the indices selected by Largest-Triangle-Three-Buckets"""
+    n = len(y)
+    if num_points >= n or num_points < 3:
+        return np.arange(n)
+
+    # First and last points are always kept, the rest is split into buckets
+    edges = np.linspace(1, n - 1, num_points - 1).astype(int)
+    starts = edges[:-1]
+    ends = edges[1:]
+
+    # Average point of every bucket over its finite samples only, used as the
+    # third triangle vertex (NaN when the bucket has no finite sample)
+    finite = np.isfinite(x) & np.isfinite(y)
+    inner = slice(1, n - 1)
+    counts = np.add.reduceat(finite[inner].astype(float), starts - 1)
+    sum_x = np.add.reduceat(np.where(finite, x, 0)[inner], starts - 1)
+    sum_y = np.add.reduceat(np.where(finite, y, 0)[inner], starts - 1)
+    avg_x = np.divide(sum_x, counts, out=np.full(len(counts), np.nan), where=counts > 0)
+    avg_y = np.divide(sum_y, counts, out=np.full(len(counts), np.nan), where=counts > 0)
+    avg_x = np.append(avg_x[1:], x[n - 1])
+    avg_y = np.append(avg_y[1:], y[n - 1])
+
+    indices = np.empty(num_points, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+    anchor = 0
+    for i in range(num_points - 2):
+        candidates = starts[i] + np.flatnonzero(finite[starts[i]:ends[i]])
+        if len(candidates) == 0:
+            # Nothing drawable in this bucket, keep its first sample
+            anchor = starts[i]
+        elif not finite[anchor]:
+            # No triangle can be formed from a non-finite anchor
+            anchor = candidates[0]
+        elif not (np.isfinite(avg_x[i]) and np.isfinite(avg_y[i])):
+            # Next bucket has no finite sample, keep the farthest point from the anchor
+            anchor = candidates[np.argmax(np.abs(y[candidates] - y[anchor]))]
+        else:
+            # Twice the triangle area formed by the anchor, candidate and next average
+            areas = np.abs(
+                (x[anchor] - avg_x[i]) * (y[candidates] - y[anchor])
+                - (x[anchor] - x[candidates]) * (avg_y[i] - y[anchor])
+            )
+            anchor = candidates[np.argmax(areas)]
+        indices[i + 1] = anchor
+
+    return indices
+
+def build_pyramid(y):
+    """Build min-max decimation levels, each about half the size of the previous one"""
+    levels = [np.arange(len(y))]
+    while len(levels[-1]) > 2 * MIN_PYRAMID_POINTS:
+        previous = levels[-1]
+        # Min-max over buckets of about 4 points keeps 2 of them
+        selected = minmax_indices(y[previous], len(previous) // 4)
+        levels.append(previous[selected])
+    return levels
+
+class SeriesCache:
+    """Thread-safe LRU cache of raw series and their decimation pyramids"""
+
+    def __init__(self, max_size=SERIES_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, x, y):
+        x = np.ascontiguousarray(x, dtype=float)
+        y = np.ascontiguousarray(y, dtype=float)
+        digest = hashlib.sha1()
+        digest.update(x.tobytes())
+        digest.update(y.tobytes())
+        series_id = digest.hexdigest()
+
+        with self._lock:
+            if series_id in self._entries:
+                self._entries.move_to_end(series_id)
+                return series_id, self._entries[series_id]
+
+        # Build outside the lock, a duplicate build on a race is harmless
+        entry = {'x': x, 'y': y, 'pyramid': build_pyramid(y)}
+        with self._lock:
+            self._entries[series_id] = entry
+            self._entries.move_to_end(series_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return series_id, entry
+
+    def get(self, series_id):
+        with self._lock:
+            entry = self._entries.get(series_id)
+            if entry is not None:
+                self._entries.move_to_end(series_id)
+            return entry
+
+series_cache = SeriesCache()
+
+def parse_downsampling_options(options, allow_range=False):
+    """Validate the client's downsampling options and fill in the defaults"""
+    if options is None:
+        options = {}
+    if not isinstance(options, Mapping):
+        raise ValueError("downsampling must be an object with 'method' and 'target_points' fields")
+
+    method = options.get('method')
+    if method is None:
+        method = DEFAULT_DOWNSAMPLING_METHOD
+    if not isinstance(method, str):
+        raise ValueError(f"method must be one of {', '.join(DOWNSAMPLING_METHODS)}")
+    method = method.lower()
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {', '.join(DOWNSAMPLING_METHODS)}")
+
+    target_points = options.get('target_points')
+    if target_points is None:
+        target_points = DEFAULT_TARGET_POINTS
+    # Query strings only carry text, JSON payloads must send an integer
+    if isinstance(target_points, str) and target_points.strip().lstrip('+-').isdigit():
+        target_points = int(target_points)
+    if isinstance(target_points, bool) or not isinstance(target_points, int):
+        raise ValueError(f"target_points must be an integer, got '{target_points}'")
+    if not MIN_TARGET_POINTS <= target_points <= MAX_TARGET_POINTS:
+        raise ValueError(f"target_points must be between {MIN_TARGET_POINTS} and {MAX_TARGET_POINTS}")
+
+    x_min = options.get('x_min')
+    x_max = options.get('x_max')
+    if not allow_range and (x_min is not None or x_max is not None):
+        # Series of one simulation have different x units, so a range only
+        # makes sense for a single series
+        raise ValueError("x_min/x_max are only accepted on /api/series/<series_id>")
+    try:
+        x_min = None if x_min is None else float(x_min)
+        x_max = None if x_max is None else float(x_max)
+    except (TypeError, ValueError):
+        raise ValueError("x_min and x_max must be numbers")
+    if x_min is not None and x_max is not None and x_min >= x_max:
+        raise ValueError("x_min must be lower than x_max")
+
+    return {'method': method, 'target_points': target_points, 'x_min': x_min, 'x_max': x_max}
+
+def to_json_list(values):
+    # JSON has no representation for NaN or infinity
+    return [float(v) if np.isfinite(v) else None for v in values]
+
+def decimate_series(series_id, entry, options):
+    """Downsample a cached series, serving the requested x range from its pyramid"""
+    x, y = entry['x'], entry['y']
+    method = options['method']
+    target_points = options['target_points']
+
+    # Pick the coarsest level that still has enough points in the visible range
+    # (series are sampled on an increasing x axis). The full-range LTTB view is
+    # computed on the raw samples; zoomed LTTB views run on a min-max level,
+    # which keeps the extremes the finer samples would have contributed.
+    zoomed = options['x_min'] is not None or options['x_max'] is not None
+    raw_only = method == 'none' or (method == 'lttb' and not zoomed)
+    indices = None
+    for level in entry['pyramid']:
+        level_x = x[level]
+        start = 0 if options['x_min'] is None else np.searchsorted(level_x, options['x_min'], side='left')
+        end = len(level) if options['x_max'] is None else np.searchsorted(level_x, options['x_max'], side='right')
+        if indices is not None and end - start < 2 * target_points:
+            break
+        indices = level[start:end]
+        if raw_only:
+            break
+
+    if method == 'lttb':
+        indices = indices[lttb_indices(x[indices], y[indices], target_points)]
+    elif method == 'minmax':
+        indices = indices[minmax_indices(y[indices], target_points // 2)]
+
+    return {
+        'series_id': series_id,
+        'method': method,
+        'raw_points': len(x),
+        'points': len(indices),
+        'x': to_json_list(x[indices]),
+        'y': to_json_list(y[indices])
+    }
+
+def downsample_series(x, y, options):
+    """Cache a freshly simulated series and return its downsampled JSON form"""
+    series_id, entry = series_cache.add(x, y)
+    return decimate_series(series_id, entry, options)
+
 # Endpoint 1: Simple Laser Transmission Simulation
 @app.route('/api/simulate/laser-transmission', methods=['POST'])
 def simulate_laser_transmission():
@@ -135,6 +363,8 @@ def simulate_laser_transmission():
         distance = connection_config['distance']['value']  # m
         medium = connection_config['medium']['value']
         
+        downsampling = parse_downsampling_options(data.get('downsampling'))
+        
         # Calculate attenuation based on medium
         if medium == "fiber":
             # Typical fiber attenuation coefficient (dB/km)
@@ -166,13 +396,19 @@ def simulate_laser_transmission():
         # Generate power vs distance graph
         power_vs_distance_graph = generate_power_vs_distance(distances, powers)
         
+        # Downsampled raw series for client-side plotting
+        series = {
+            'power_vs_distance': downsample_series(distances, powers, downsampling)
+        }
+        
         return jsonify({
             'success': True,
             'results': {
                 'power_received': power_received,
                 'snr': float(snr),
                 'ber': float(ber),
-                'power_vs_distance_graph': power_vs_distance_graph
+                'power_vs_distance_graph': power_vs_distance_graph,
+                'series': series
             }
         })
     
@@ -205,6 +441,8 @@ def simulate_fiber_dispersion():
         dispersion_coeff = fiber_config['dispersion_coeff']['value']  # ps/nm/km
         spectral_width = 0.1  # nm (assuming a default if not provided)
         
+        downsampling = parse_downsampling_options(data.get('downsampling'))
+        
         # Calculate temporal broadening due to dispersion
         temporal_broadening = abs(dispersion_coeff) * fiber_length / 1000 * spectral_width  # ps
         
@@ -261,6 +499,12 @@ def simulate_fiber_dispersion():
         
         spectrum_graph = generate_spectrum(frequencies, spectrum_db)
         
+        # Downsampled raw series for client-side plotting
+        series = {
+            'waveform': downsample_series(time, dispersed_signal, downsampling),
+            'spectrum': downsample_series(frequencies, spectrum_db, downsampling)
+        }
+        
         return jsonify({
             'success': True,
             'results': {
@@ -268,7 +512,8 @@ def simulate_fiber_dispersion():
                 'attenuation': float(attenuation),  # dB
                 'output_power': float(output_power),  # mW
                 'eye_diagram': eye_diagram,
-                'spectrum': spectrum_graph
+                'spectrum': spectrum_graph,
+                'series': series
             }
         })
     
@@ -298,6 +543,8 @@ def simulate_edfa_amplifier():
         er_concentration = edfa_config['er_concentration']['value']  # ppm
         saturation_power = edfa_config['saturation_power']['value']  # mW
         
+        downsampling = parse_downsampling_options(data.get('downsampling'))
+        
         # Convert input power from dBm to mW
         input_power = 10**(input_power_dbm/10)  # mW
         
@@ -332,13 +579,46 @@ def simulate_edfa_amplifier():
         # Generate gain spectrum graph
         gain_spectrum_graph = generate_gain_spectrum(wavelengths, gains_db, noise_figures)
         
+        # Downsampled raw series for client-side plotting
+        series = {
+            'gain': downsample_series(wavelengths, gains_db, downsampling),
+            'noise_figure': downsample_series(wavelengths, noise_figures, downsampling)
+        }
+        
         return jsonify({
             'success': True,
             'results': {
                 'gain_db': float(gain_db),
                 'output_power_dbm': float(output_power_dbm),
                 'noise_figure_db': float(noise_figure_db),
-                'gain_spectrum': gain_spectrum_graph
+                'gain_spectrum': gain_spectrum_graph,
+                'series': series
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+# Series zoom endpoint: re-decimates a cached series without re-running the simulation
+@app.route('/api/series/<series_id>', methods=['GET'])
+def get_series(series_id):
+    try:
+        entry = series_cache.get(series_id)
+        if entry is None:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown or expired series '{series_id}'"
+            }), 404
+        
+        downsampling = parse_downsampling_options(request.args, allow_range=True)
+        
+        return jsonify({
+            'success': True,
+            'results': {
+                'series': decimate_series(series_id, entry, downsampling)
             }
         })
     
@@ -0,0 +1,129 @@
+import warnings
+import numpy as np
+from app import (
+    lttb_indices, minmax_indices, parse_downsampling_options, series_cache,
+    decimate_series, DEFAULT_DOWNSAMPLING_METHOD, DEFAULT_TARGET_POINTS
+)
+
+# Unit checks of the downsampling helpers, run in-process without a server
+
+def test_decimation_helpers():
+    """Test the LTTB and min-max index selection directly"""
+    rng = np.random.default_rng(0)
+    for n, target in [(1000, 999), (1001, 1000), (1003, 100), (5000, 7)]:
+        x = np.arange(n, dtype=float)
+        y = rng.standard_normal(n)
+        
+        indices = lttb_indices(x, y, target)
+        assert len(indices) == target
+        assert np.all(np.diff(indices) > 0)
+        assert indices[0] == 0 and indices[-1] == n - 1
+        
+        # Every bucket holds at least two random samples, so min and max differ
+        indices = minmax_indices(y, target // 2)
+        assert len(indices) == 2 * (target // 2)
+        assert np.all(np.diff(indices) > 0)
+    
+    # Nothing to drop when the series already fits
+    y = rng.standard_normal(50)
+    assert np.array_equal(lttb_indices(np.arange(50.0), y, 50), np.arange(50))
+    assert np.array_equal(minmax_indices(y, 25), np.arange(50))
+    assert len(minmax_indices(rng.standard_normal(51), 25)) == 50
+    
+    # Non-finite samples, like log10(0) in a dB spectrum, are skipped without warnings
+    x = np.linspace(-1, 1, 1000)
+    with np.errstate(divide="ignore"):
+        y = 10 * np.log10(np.exp(-0.5 * (x / 0.05) ** 2 * 1000))
+    finite = np.isfinite(y)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        indices = lttb_indices(x, y, 100)
+    assert np.all(np.diff(indices) > 0)
+    # Every bucket with a finite sample keeps a finite one
+    edges = np.linspace(1, len(y) - 1, 100 - 1).astype(int)
+    for start, end, index in zip(edges[:-1], edges[1:], indices[1:-1]):
+        assert finite[index] or not finite[start:end].any()
+    print("Decimation Helpers Test: Success")
+    return True
+
+def test_downsampling_options():
+    """Test validation of the downsampling options"""
+    # Unset fields fall back to the defaults
+    for options in (None, {}, {"method": None, "target_points": None}):
+        parsed = parse_downsampling_options(options)
+        assert parsed["method"] == DEFAULT_DOWNSAMPLING_METHOD
+        assert parsed["target_points"] == DEFAULT_TARGET_POINTS
+    
+    # Query strings carry integers as text
+    parsed = parse_downsampling_options({"method": "MinMax", "target_points": "200"}, allow_range=True)
+    assert parsed["method"] == "minmax"
+    assert parsed["target_points"] == 200
+    
+    invalid = [
+        ("lttb", "downsampling"),
+        ({"method": 3}, "method"),
+        ({"method": "bogus"}, "method"),
+        ({"target_points": 2.7}, "target_points"),
+        ({"target_points": "2.7"}, "target_points"),
+        ({"target_points": True}, "target_points"),
+        ({"target_points": 2}, "target_points"),
+        ({"x_min": 0}, "x_min"),
+    ]
+    for options, field in invalid:
+        try:
+            parse_downsampling_options(options)
+        except ValueError as e:
+            assert field in str(e), str(e)
+        else:
+            raise AssertionError(f"{options!r} was accepted")
+    print("Downsampling Options Test: Success")
+    return True
+
+def test_full_range_lttb_uses_raw_samples():
+    """Test that the unzoomed LTTB view is computed on the raw samples"""
+    rng = np.random.default_rng(1)
+    x = np.arange(2048, dtype=float)
+    y = rng.standard_normal(2048)
+    series_id, entry = series_cache.add(x, y)
+    assert len(entry["pyramid"]) > 1
+    
+    series = decimate_series(series_id, entry, parse_downsampling_options({"target_points": 200}))
+    expected = lttb_indices(x, y, 200)
+    assert series["x"] == x[expected].tolist()
+    print("Full Range LTTB Test: Success")
+    return True
+
+def run_all_tests():
+    """Run all test functions"""
+    print("Starting tests...")
+    
+    tests = [
+        test_decimation_helpers,
+        test_downsampling_options,
+        test_full_range_lttb_uses_raw_samples
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            result = test()
+            results.append(result)
+            print(f"{test.__name__}: {'PASSED' if result else 'FAILED'}")
+        except Exception as e:
+            results.append(False)
+            print(f"{test.__name__}: FAILED - {str(e)}")
+    
+    print("\nTest Summary:")
+    print(f"Total Tests: {len(tests)}")
+    print(f"Passed: {results.count(True)}")
+    print(f"Failed: {results.count(False)}")
+    
+    return all(results)
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    
+    if success:
+        print("\nAll tests passed successfully!")
+    else:
+        print("\nSome tests failed. Check the output above for details.")
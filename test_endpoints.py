@@ -68,6 +68,7 @@ def test_laser_transmission():
     assert data["success"] == True
     assert "power_received" in data["results"]
     assert "power_vs_distance_graph" in data["results"]
+    assert "power_vs_distance" in data["results"]["series"]
     return True
 
 def test_fiber_dispersion():
@@ -139,6 +140,8 @@ def test_fiber_dispersion():
     assert data["success"] == True
     assert "eye_diagram" in data["results"]
     assert "spectrum" in data["results"]
+    assert "waveform" in data["results"]["series"]
+    assert "spectrum" in data["results"]["series"]
     return True
 
 def test_edfa_amplifier():
@@ -193,6 +196,129 @@ def test_edfa_amplifier():
     assert data["success"] == True
     assert "gain_db" in data["results"]
     assert "gain_spectrum" in data["results"]
+    assert "gain" in data["results"]["series"]
+    assert "noise_figure" in data["results"]["series"]
+    return True
+
+def test_series_downsampling():
+    """Test that a returned series can be re-decimated from the cache"""
+    payload = {
+        "nodes": [
+            {"config": {
+                "optical_power": {"value": 10},
+                "wavelength": {"value": 1550},
+                "spectral_width": {"value": 0.1}
+            }},
+            {"config": {
+                "sensitivity": {"value": 0.8},
+                "dark_current": {"value": 10},
+                "bandwidth": {"value": 10},
+                "noise_temperature": {"value": 300}
+            }}
+        ],
+        "connections": [
+            {"config": {
+                "distance": {"value": 1000},
+                "medium": {"value": "fiber"}
+            }}
+        ],
+        "downsampling": {"method": "minmax", "target_points": 20}
+    }
+    
+    response = requests.post(f"{BASE_URL}/simulate/laser-transmission", json=payload)
+    data = response.json()
+    series = data["results"]["series"]["power_vs_distance"]
+    assert series["method"] == "minmax"
+    assert series["raw_points"] == 100
+    assert series["points"] <= 20
+    assert len(series["x"]) == len(series["y"]) == series["points"]
+    
+    # Zoom into the first half of the curve using the cached series
+    response = requests.get(
+        f"{BASE_URL}/series/{series['series_id']}",
+        params={"method": "lttb", "target_points": 10, "x_min": 0, "x_max": 500}
+    )
+    data = response.json()
+    print("Series Downsampling Test:", "Success" if data.get("success") else "Failed")
+    assert response.status_code == 200
+    zoomed = data["results"]["series"]
+    assert zoomed["points"] == 10
+    assert min(zoomed["x"]) >= 0 and max(zoomed["x"]) <= 500
+    
+    # Invalid methods are rejected
+    response = requests.get(f"{BASE_URL}/series/{series['series_id']}", params={"method": "bogus"})
+    assert response.status_code == 400
+    
+    # The visible range is only accepted per series, and options must be an object
+    payload["downsampling"] = {"x_min": 0, "x_max": 500}
+    response = requests.post(f"{BASE_URL}/simulate/laser-transmission", json=payload)
+    assert response.status_code == 400
+    assert "x_min" in response.json()["error"]
+    payload["downsampling"] = "lttb"
+    response = requests.post(f"{BASE_URL}/simulate/laser-transmission", json=payload)
+    assert response.status_code == 400
+    assert "downsampling" in response.json()["error"]
+    payload["downsampling"] = {"target_points": 2.7}
+    response = requests.post(f"{BASE_URL}/simulate/laser-transmission", json=payload)
+    assert response.status_code == 400
+    assert "target_points" in response.json()["error"]
+    
+    # Fields left unset by the frontend fall back to the defaults
+    payload["downsampling"] = {"method": None, "target_points": None}
+    response = requests.post(f"{BASE_URL}/simulate/laser-transmission", json=payload)
+    assert response.status_code == 200
+    assert response.json()["results"]["series"]["power_vs_distance"]["method"] == "lttb"
+    return True
+
+def test_waveform_zoom():
+    """Test zooming into the waveform, which is large enough to use the pyramid levels"""
+    payload = {
+        "nodes": [
+            {"config": {
+                "carrier_wavelength": {"value": 1550},
+                "optical_power": {"value": 5},
+                "bit_rate": {"value": 10},
+                "modulation_type": {"value": "NRZ"},
+                "extinction_ratio": {"value": 10}
+            }},
+            {"config": {
+                "length": {"value": 50},
+                "attenuation_coeff": {"value": 0.2},
+                "dispersion_coeff": {"value": 17}
+            }},
+            {"config": {}}
+        ],
+        "connections": [],
+        "downsampling": {"method": "lttb", "target_points": 200}
+    }
+    
+    response = requests.post(f"{BASE_URL}/simulate/fiber-dispersion", json=payload)
+    data = response.json()
+    waveform = data["results"]["series"]["waveform"]
+    assert waveform["raw_points"] == 2048
+    assert waveform["points"] == 200
+    
+    # 128 bits at 10 Gbps last 12.8 ns, zoom into a third of them
+    x_min, x_max = 2e-9, 6e-9
+    for method in ("lttb", "minmax"):
+        response = requests.get(
+            f"{BASE_URL}/series/{waveform['series_id']}",
+            params={"method": method, "target_points": 100, "x_min": x_min, "x_max": x_max}
+        )
+        assert response.status_code == 200
+        zoomed = response.json()["results"]["series"]
+        assert 0 < zoomed["points"] <= 100
+        assert min(zoomed["x"]) >= x_min and max(zoomed["x"]) <= x_max
+        assert zoomed["x"] == sorted(zoomed["x"])
+    
+    # A range outside the series gives an empty series
+    response = requests.get(
+        f"{BASE_URL}/series/{waveform['series_id']}",
+        params={"x_min": 1, "x_max": 2}
+    )
+    assert response.status_code == 200
+    assert response.json()["results"]["series"]["points"] == 0
+    print("Waveform Zoom Test: Success")
     return True
 
 def run_all_tests():
@@ -203,7 +329,9 @@ def run_all_tests():
         test_health_endpoint,
         test_laser_transmission,
         test_fiber_dispersion,
-        test_edfa_amplifier
+        test_edfa_amplifier,
+        test_series_downsampling,
+        test_waveform_zoom
     ]
     
     results = []